@@ -0,0 +1,44 @@
+"""
+Signature comparison helpers for webhook_server.py.
+
+Everything here is strictly typed so the module can be compiled with mypyc,
+which removes the Python-level overhead around the HMAC itself:
+
+    pip install mypy
+    mypyc auth_fast.py
+
+The compiled extension is picked up automatically by `import auth_fast`;
+without it the plain Python module is used unchanged.
+"""
+import hmac
+
+SIGNATURE_PREFIX = "sha256="
+SIGNATURE_PREFIX_LEN = len(SIGNATURE_PREFIX)
+
+def signature_matches(signature: str, expected_digest: bytes) -> bool:
+    """
+    Check a hex signature header against an already computed HMAC-SHA256 digest
+    """
+    if not signature:
+        return False
+
+    # Remove 'sha256=' prefix if present (GitHub style)
+    if signature.startswith(SIGNATURE_PREFIX):
+        signature = signature[SIGNATURE_PREFIX_LEN:]
+
+    # Decode the provided hex signature once; malformed hex can never match
+    try:
+        signature_bytes = bytes.fromhex(signature)
+    except ValueError:
+        return False
+
+    # Use secure comparison on the raw 32-byte digests to prevent timing attacks
+    return hmac.compare_digest(signature_bytes, expected_digest)
+
+def verify_signature(payload: bytes, signature: str, secret: bytes) -> bool:
+    """
+    Verify webhook signature using a one-shot HMAC-SHA256 of the whole payload
+    """
+    if not signature:
+        return False
+    return signature_matches(signature, hmac.digest(secret, payload, "sha256"))
@@ -4,182 +4,244 @@ Test script for the webhook client
 """
 import asyncio
 import time
-from .webhook_client import WebhookClient, EventEmitter, DeliveryStatus
+from email.utils import formatdate
+import httpx
+from .webhook_client import WebhookClient, EventEmitter, DeliveryStatus, install_uvloop, _parse_retry_after
 
 async def test_basic_webhook():
     """Test basic webhook sending"""
     print("🧪 Testing basic webhook sending...")
     
-    client = WebhookClient(secret_key="test-secret-for-verification")
-    
-    payload = {
-        "event_type": "test.basic",
-        "timestamp": int(time.time()),
-        "data": {"message": "Basic webhook test"}
-    }
-    
-    delivery = await client.send_webhook(
-        url="http://localhost:8000/webhook",
-        payload=payload
-    )
-    
-    print(f"✅ Delivery ID: {delivery.id}")
-    print(f"✅ Status: {delivery.status.value}")
-    print(f"✅ Attempts: {delivery.attempts}")
-    print(f"✅ Response Status: {delivery.response_status}")
-    print()
+    async with WebhookClient(secret_key="test-secret-for-verification") as client:
+        payload = {
+            "event_type": "test.basic",
+            "timestamp": int(time.time()),
+            "data": {"message": "Basic webhook test"}
+        }
+        
+        delivery = await client.send_webhook(
+            url="http://localhost:8000/webhook",
+            payload=payload
+        )
+        
+        print(f"✅ Delivery ID: {delivery.id}")
+        print(f"✅ Status: {delivery.status.value}")
+        print(f"✅ Attempts: {delivery.attempts}")
+        print(f"✅ Response Status: {delivery.response_status}")
+        print()
 
 async def test_webhook_with_retry():
     """Test webhook with retry on failure"""
     print("🧪 Testing webhook with retry (using invalid URL)...")
     
-    client = WebhookClient(
+    async with WebhookClient(
         secret_key="test-secret-for-verification",
         max_retries=2,
         timeout=5
-    )
-    
-    # Add callback to monitor delivery attempts
-    def on_delivery_change(delivery):
-        print(f"📊 Delivery {delivery.id}: {delivery.status.value} (attempt {delivery.attempts})")
-    
-    client.add_delivery_callback(on_delivery_change)
-    
-    payload = {
-        "event_type": "test.retry",
-        "data": {"message": "Retry test"}
-    }
-    
-    # Test with invalid URL to trigger retries
-    delivery = await client.send_webhook(
-        url="http://invalid-webhook-url:9999/webhook",
-        payload=payload
-    )
-    
-    print(f"✅ Final Status: {delivery.status.value}")
-    print(f"✅ Total Attempts: {delivery.attempts}")
-    print(f"✅ Error: {delivery.error_message}")
-    print()
+    ) as client:
+        # Add callback to monitor delivery attempts
+        def on_delivery_change(delivery):
+            print(f"📊 Delivery {delivery.id}: {delivery.status.value} (attempt {delivery.attempts})")
+        
+        client.add_delivery_callback(on_delivery_change)
+        
+        payload = {
+            "event_type": "test.retry",
+            "data": {"message": "Retry test"}
+        }
+        
+        # Test with invalid URL to trigger retries
+        delivery = await client.send_webhook(
+            url="http://invalid-webhook-url:9999/webhook",
+            payload=payload
+        )
+        await client.drain_callbacks()
+        
+        print(f"✅ Final Status: {delivery.status.value}")
+        print(f"✅ Total Attempts: {delivery.attempts}")
+        print(f"✅ Error: {delivery.error_message}")
+        print()
 
 async def test_multiple_webhooks():
     """Test sending multiple webhooks concurrently"""
     print("🧪 Testing multiple webhook sending...")
     
-    client = WebhookClient(secret_key="test-secret-for-verification")
-    
-    webhooks = [
-        {
-            "url": "http://localhost:8000/webhook",
-            "payload": {
-                "event_type": "test.multi",
-                "data": {"id": i, "message": f"Multi webhook test {i}"}
-            },
-            "delivery_id": f"multi_test_{i}"
-        }
-        for i in range(5)
-    ]
-    
-    start_time = time.time()
-    results = await client.send_multiple(webhooks, max_concurrent=3)
-    end_time = time.time()
-    
-    print(f"✅ Sent {len(webhooks)} webhooks in {end_time - start_time:.2f} seconds")
-    
-    success_count = sum(1 for r in results if hasattr(r, 'status') and r.status == DeliveryStatus.SUCCESS)
-    print(f"✅ Successful deliveries: {success_count}/{len(webhooks)}")
-    
-    # Show delivery stats
-    stats = client.get_delivery_stats()
-    print(f"✅ Delivery stats: {stats}")
-    print()
+    async with WebhookClient(secret_key="test-secret-for-verification") as client:
+        webhooks = [
+            {
+                "url": "http://localhost:8000/webhook",
+                "payload": {
+                    "event_type": "test.multi",
+                    "data": {"id": i, "message": f"Multi webhook test {i}"}
+                },
+                "delivery_id": f"multi_test_{i}"
+            }
+            for i in range(5)
+        ]
+        
+        start_time = time.time()
+        results = await client.send_multiple(webhooks, max_concurrent=3)
+        end_time = time.time()
+        
+        print(f"✅ Sent {len(webhooks)} webhooks in {end_time - start_time:.2f} seconds")
+        
+        success_count = sum(1 for r in results if hasattr(r, 'status') and r.status == DeliveryStatus.SUCCESS)
+        print(f"✅ Successful deliveries: {success_count}/{len(webhooks)}")
+        
+        # Show delivery stats
+        stats = client.get_delivery_stats()
+        print(f"✅ Delivery stats: {stats}")
+        print()
 
 async def test_event_emitter():
     """Test the EventEmitter class"""
     print("🧪 Testing EventEmitter...")
     
-    client = WebhookClient(secret_key="test-secret-for-verification")
-    
-    # Multiple webhook URLs (including one invalid for demonstration)
-    webhook_urls = [
-        "http://localhost:8000/webhook",
-        # "http://localhost:8001/webhook"  # Uncomment to test multiple endpoints
-    ]
-    
-    emitter = EventEmitter(client, webhook_urls)
-    
-    # Emit user created event
-    await emitter.emit_user_created({
-        "id": "user_12345",
-        "email": "newuser@example.com",
-        "name": "New User",
-        "created_at": time.time()
-    })
-    
-    # Emit order completed event
-    await emitter.emit_order_completed({
-        "id": "order_67890",
-        "user_id": "user_12345",
-        "amount": 99.99,
-        "status": "completed"
-    })
-    
-    print("✅ Events emitted successfully")
-    
-    # Show final stats
-    stats = client.get_delivery_stats()
-    print(f"✅ Final delivery stats: {stats}")
-    print()
+    async with WebhookClient(secret_key="test-secret-for-verification") as client:
+        # Multiple webhook URLs (including one invalid for demonstration)
+        webhook_urls = [
+            "http://localhost:8000/webhook",
+            # "http://localhost:8001/webhook"  # Uncomment to test multiple endpoints
+        ]
+        
+        emitter = EventEmitter(client, webhook_urls)
+        
+        # Emit user created event
+        await emitter.emit_user_created({
+            "id": "user_12345",
+            "email": "newuser@example.com",
+            "name": "New User",
+            "created_at": time.time()
+        })
+        
+        # Emit order completed event
+        await emitter.emit_order_completed({
+            "id": "order_67890",
+            "user_id": "user_12345",
+            "amount": 99.99,
+            "status": "completed"
+        })
+        
+        print("✅ Events emitted successfully")
+        
+        # Show final stats
+        stats = client.get_delivery_stats()
+        print(f"✅ Final delivery stats: {stats}")
+        print()
+
+async def test_batched_event_emitter():
+    """Test EventEmitter batching several events into one request"""
+    print("🧪 Testing batched EventEmitter...")
+    
+    async with WebhookClient(secret_key="test-secret-for-verification") as client:
+        emitter = EventEmitter(
+            client,
+            ["http://localhost:8000/webhook"],
+            batch_size=10,
+            flush_interval_ms=100
+        )
+        
+        for i in range(5):
+            await emitter.emit_user_created({"id": f"user_{i}", "email": f"user{i}@example.com"})
+        
+        await emitter.aclose()
+        
+        deliveries = client.get_all_deliveries()
+        print(f"✅ Requests sent for 5 events: {len(deliveries)}")
+        print(f"✅ Batch status: {deliveries[0].status.value}")
+        print(f"✅ Response: {deliveries[0].response_body}")
+        print()
 
 async def test_delivery_tracking():
     """Test delivery tracking and monitoring"""
     print("🧪 Testing delivery tracking...")
     
-    client = WebhookClient(secret_key="test-secret-for-verification")
-    
-    # Send a webhook
-    delivery = await client.send_webhook(
-        url="http://localhost:8000/webhook",
-        payload={"event_type": "test.tracking", "data": {"test": True}},
-        delivery_id="tracking_test_001"
-    )
-    
-    # Retrieve delivery by ID
-    retrieved_delivery = client.get_delivery("tracking_test_001")
-    print(f"✅ Retrieved delivery: {retrieved_delivery.id}")
-    print(f"✅ Status: {retrieved_delivery.status.value}")
-    print(f"✅ Created at: {time.ctime(retrieved_delivery.created_at)}")
-    print(f"✅ Last attempt: {time.ctime(retrieved_delivery.last_attempt_at) if retrieved_delivery.last_attempt_at else 'Never'}")
-    
-    # Get all deliveries
-    all_deliveries = client.get_all_deliveries()
-    print(f"✅ Total deliveries tracked: {len(all_deliveries)}")
-    
-    # Get deliveries by status
-    successful_deliveries = client.get_deliveries_by_status(DeliveryStatus.SUCCESS)
-    print(f"✅ Successful deliveries: {len(successful_deliveries)}")
-    print()
+    async with WebhookClient(secret_key="test-secret-for-verification") as client:
+        # Send a webhook
+        delivery = await client.send_webhook(
+            url="http://localhost:8000/webhook",
+            payload={"event_type": "test.tracking", "data": {"test": True}},
+            delivery_id="tracking_test_001"
+        )
+        
+        # Retrieve delivery by ID
+        retrieved_delivery = client.get_delivery("tracking_test_001")
+        print(f"✅ Retrieved delivery: {retrieved_delivery.id}")
+        print(f"✅ Status: {retrieved_delivery.status.value}")
+        print(f"✅ Created at: {time.ctime(retrieved_delivery.created_at)}")
+        print(f"✅ Last attempt: {time.ctime(retrieved_delivery.last_attempt_at) if retrieved_delivery.last_attempt_at else 'Never'}")
+        
+        # Get all deliveries
+        all_deliveries = client.get_all_deliveries()
+        print(f"✅ Total deliveries tracked: {len(all_deliveries)}")
+        
+        # Get deliveries by status
+        successful_deliveries = client.get_deliveries_by_status(DeliveryStatus.SUCCESS)
+        print(f"✅ Successful deliveries: {len(successful_deliveries)}")
+        print()
 
 async def test_wrong_secret():
     """Test webhook with wrong secret - should fail with 401"""
     print("🧪 Testing webhook with wrong secret (security test)...")
     
-    client = WebhookClient(secret_key="wrong-secret-intentionally")
-    
-    try:
-        delivery = await client.send_webhook(
-            url="http://localhost:8000/webhook",
-            payload={"event_type": "test.security", "data": {"test": True}},
-            delivery_id="security_test_001"
-        )
+    async with WebhookClient(secret_key="wrong-secret-intentionally") as client:
+        try:
+            delivery = await client.send_webhook(
+                url="http://localhost:8000/webhook",
+                payload={"event_type": "test.security", "data": {"test": True}},
+                delivery_id="security_test_001"
+            )
+            
+            if delivery.status == DeliveryStatus.FAILED and delivery.response_status == 401:
+                print("✅ PASSED: Wrong secret correctly rejected (401)")
+                print(f"✅ Attempts: {delivery.attempts} (4xx responses are not retried)")
+            else:
+                print(f"❌ FAILED: Expected 401, got status={delivery.status.value}, response_status={delivery.response_status}")
+                print(f"   Error: {delivery.error_message}")
+            
+        except Exception as e:
+            print(f"❌ FAILED: Exception occurred: {e}")
+        
+        print()
+
+async def test_retry_after():
+    """Test Retry-After handling and which HTTP statuses are retried"""
+    print("🧪 Testing Retry-After and retriable statuses...")
+    
+    # Retry-After is either a delay in seconds or an HTTP date
+    http_date = formatdate(time.time() + 30, usegmt=True)
+    parsed_seconds = _parse_retry_after("5")
+    parsed_date = _parse_retry_after(http_date)
+    if parsed_seconds == 5.0 and parsed_date is not None and 25 <= parsed_date <= 30 and _parse_retry_after("soon") is None:
+        print(f"✅ Parsed Retry-After: '5' -> {parsed_seconds}s, HTTP date -> {parsed_date:.0f}s, 'soon' -> None")
+    else:
+        print(f"❌ FAILED: Retry-After parsed as {parsed_seconds}, {parsed_date}")
+    
+    # 429 and 503 are retried after the server's Retry-After (here: now), not after
+    # the 30s backoff; the 400 is a permanent failure and is not retried
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503, headers={"Retry-After": formatdate(time.time() - 60, usegmt=True)}),
+        httpx.Response(200, text="ok"),
+        httpx.Response(400, text="bad request"),
+    ])
+    
+    async with WebhookClient(secret_key="test-secret-for-verification", max_retries=3, retry_wait_min=30) as client:
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses)))
         
-        if delivery.status == DeliveryStatus.FAILED and delivery.response_status == 401:
-            print("✅ PASSED: Wrong secret correctly rejected (401)")
+        start_time = time.time()
+        delivery = await client.send_webhook(url="http://webhook.test/webhook", payload={"event_type": "test.retry_after"})
+        elapsed = time.time() - start_time
+        if delivery.status == DeliveryStatus.SUCCESS and delivery.attempts == 3 and elapsed < 5:
+            print(f"✅ PASSED: 429 and 503 retried per Retry-After, delivered on attempt 3 in {elapsed:.2f}s")
         else:
-            print(f"❌ FAILED: Expected 401, got status={delivery.status.value}, response_status={delivery.response_status}")
-            print(f"   Error: {delivery.error_message}")
-            
-    except Exception as e:
-        print(f"❌ FAILED: Exception occurred: {e}")
+            print(f"❌ FAILED: status={delivery.status.value}, attempts={delivery.attempts}, took {elapsed:.2f}s")
+        
+        delivery = await client.send_webhook(url="http://webhook.test/webhook", payload={"event_type": "test.permanent"})
+        if delivery.status == DeliveryStatus.FAILED and delivery.attempts == 1:
+            print("✅ PASSED: 400 failed without retrying")
+        else:
+            print(f"❌ FAILED: status={delivery.status.value}, attempts={delivery.attempts}")
     
     print()
 
@@ -200,8 +262,10 @@ async def main():
                 await test_basic_webhook()
                 await test_multiple_webhooks()
                 await test_event_emitter()
+                await test_batched_event_emitter()
                 await test_delivery_tracking()
                 await test_wrong_secret()  # Test security
+                await test_retry_after()
                 await test_webhook_with_retry()  # Run retry test last
                 
                 print("🎉 All tests completed!")
@@ -216,4 +280,5 @@ async def main():
         await test_webhook_with_retry()
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
\ No newline at end of file
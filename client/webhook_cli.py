@@ -3,28 +3,29 @@
 Command-line interface for the webhook client
 """
 import asyncio
+import itertools
 import json
 import sys
 import argparse
 from typing import Dict, Any
-from .webhook_client import WebhookClient, DeliveryStatus
+from .webhook_client import WebhookClient, DeliveryStatus, install_uvloop
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
 
 async def send_single_webhook(args):
     """Send a single webhook"""
-    client = WebhookClient(
-        secret_key=args.secret,
-        max_retries=args.retries,
-        timeout=args.timeout
-    )
-    
-    # Parse payload
+    # Parse payload only to validate and display it; the original bytes are sent as-is
     try:
         if args.payload_file:
-            with open(args.payload_file, 'r') as f:
-                payload = json.load(f)
+            with open(args.payload_file, 'rb') as f:
+                payload_bytes = f.read()
         else:
-            payload = json.loads(args.payload)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+            payload_bytes = args.payload.encode('utf-8')
+        payload = json.loads(payload_bytes)
+    except (json.JSONDecodeError, UnicodeDecodeError, FileNotFoundError) as e:
         print(f"Error parsing payload: {e}")
         return 1
     
@@ -41,11 +42,16 @@ async def send_single_webhook(args):
         print(f"Headers: {json.dumps(headers, indent=2)}")
     
     # Send webhook
-    delivery = await client.send_webhook(
-        url=args.url,
-        payload=payload,
-        headers=headers if headers else None
-    )
+    async with WebhookClient(
+        secret_key=args.secret,
+        max_retries=args.retries,
+        timeout=args.timeout
+    ) as client:
+        delivery = await client.send_webhook_raw(
+            url=args.url,
+            payload_bytes=payload_bytes,
+            headers=headers if headers else None
+        )
     
     # Print results
     print(f"\nDelivery Results:")
@@ -62,15 +68,10 @@ async def send_single_webhook(args):
 
 async def send_batch_webhooks(args):
     """Send batch webhooks from a file"""
-    client = WebhookClient(
-        secret_key=args.secret,
-        max_retries=args.retries,
-        timeout=args.timeout
-    )
-    
     try:
-        with open(args.batch_file, 'r') as f:
-            batch_data = json.load(f)
+        with open(args.batch_file, 'rb') as f:
+            raw = f.read()
+        batch_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except (json.JSONDecodeError, FileNotFoundError) as e:
         print(f"Error reading batch file: {e}")
         return 1
@@ -81,23 +82,82 @@ async def send_batch_webhooks(args):
     
     print(f"Sending {len(batch_data)} webhooks...")
     
-    # Add progress callback
+    # Add progress callback (async so it runs on the event loop, not in executor threads)
     completed = 0
-    def on_delivery_change(delivery):
+    async def on_delivery_change(delivery):
         nonlocal completed
         if delivery.status in [DeliveryStatus.SUCCESS, DeliveryStatus.FAILED]:
             completed += 1
             print(f"Progress: {completed}/{len(batch_data)} - {delivery.id}: {delivery.status.value}")
     
-    client.add_delivery_callback(on_delivery_change)
+    # Send webhooks
+    async with WebhookClient(
+        secret_key=args.secret,
+        max_retries=args.retries,
+        timeout=args.timeout
+    ) as client:
+        client.add_delivery_callback(on_delivery_change)
+        results = await client.send_multiple(batch_data, max_concurrent=args.concurrent)
+    
+    return print_batch_summary(client, len(batch_data))
+
+async def stream_batch_webhooks(args):
+    """Send batch webhooks while the batch file is still being parsed"""
+    try:
+        import ijson
+    except ImportError:
+        print("Streaming batch files requires ijson: pip install ijson")
+        return 1
+    
+    try:
+        f = open(args.batch_file, 'rb')
+    except FileNotFoundError as e:
+        print(f"Error reading batch file: {e}")
+        return 1
+    
+    loop = asyncio.get_running_loop()
+    items = ijson.items(f, 'item', use_float=True)
+    
+    async def read_webhooks():
+        # Parse in a worker thread, a chunk at a time, so parsing overlaps sending
+        while True:
+            chunk = await loop.run_in_executor(None, lambda: list(itertools.islice(items, 100)))
+            if not chunk:
+                return
+            for webhook_config in chunk:
+                yield webhook_config
+    
+    print("Streaming webhooks...")
+    
+    # Add progress callback (async so it runs on the event loop, not in executor threads)
+    completed = 0
+    async def on_delivery_change(delivery):
+        nonlocal completed
+        if delivery.status in [DeliveryStatus.SUCCESS, DeliveryStatus.FAILED]:
+            completed += 1
+            print(f"Progress: {completed} - {delivery.id}: {delivery.status.value}")
     
     # Send webhooks
-    results = await client.send_multiple(batch_data, max_concurrent=args.concurrent)
+    with f:
+        async with WebhookClient(
+            secret_key=args.secret,
+            max_retries=args.retries,
+            timeout=args.timeout
+        ) as client:
+            client.add_delivery_callback(on_delivery_change)
+            try:
+                results = await client.send_stream(read_webhooks(), max_concurrent=args.concurrent)
+            except ijson.JSONError as e:
+                print(f"Error reading batch file: {e}")
+                return 1
     
-    # Print summary
+    return print_batch_summary(client, len(results))
+
+def print_batch_summary(client: WebhookClient, total: int) -> int:
+    """Print batch delivery results and return the exit code"""
     stats = client.get_delivery_stats()
     print(f"\nBatch Results:")
-    print(f"Total: {len(batch_data)}")
+    print(f"Total: {total}")
     print(f"Success: {stats.get('success', 0)}")
     print(f"Failed: {stats.get('failed', 0)}")
     
@@ -123,11 +183,13 @@ def main():
     batch_parser = subparsers.add_parser("batch", help="Send multiple webhooks from file")
     batch_parser.add_argument("batch_file", help="JSON file containing webhook configurations")
     batch_parser.add_argument("--concurrent", type=int, default=5, help="Maximum concurrent requests")
+    batch_parser.add_argument("--stream", action="store_true", help="Parse the batch file incrementally (requires ijson)")
     
     # Generate example files command
     example_parser = subparsers.add_parser("examples", help="Generate example configuration files")
     
     args = parser.parse_args()
+    install_uvloop()
     
     if args.command == "send":
         if not args.payload and not args.payload_file:
@@ -136,6 +198,8 @@ def main():
         return asyncio.run(send_single_webhook(args))
     
     elif args.command == "batch":
+        if args.stream:
+            return asyncio.run(stream_batch_webhooks(args))
         return asyncio.run(send_batch_webhooks(args))
     
     elif args.command == "examples":
@@ -7,29 +7,79 @@ import json
 import logging
 import hmac
 import hashlib
+import sys
 import time
-from typing import Dict, Any, List, Optional, Callable
+from collections import Counter, OrderedDict
+from typing import Dict, Any, AsyncIterable, List, Optional, Callable, Set, Tuple, Union
 from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
 from enum import Enum
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def install_uvloop() -> bool:
+    """Make asyncio.run() use uvloop when it is installed; returns True if it was"""
+    try:
+        import uvloop
+    except ImportError:  # uvloop is optional and unavailable on Windows
+        return False
+    uvloop.install()
+    return True
+
+# 4xx responses worth retrying: Request Timeout, Too Early, Too Many Requests
+RETRIABLE_CLIENT_ERRORS = frozenset({408, 425, 429})
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delay in seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
 class DeliveryStatus(Enum):
     PENDING = "pending"
     SUCCESS = "success"
     FAILED = "failed"
     RETRYING = "retrying"
 
-@dataclass
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class WebhookDelivery:
     """Represents a webhook delivery attempt"""
     id: str
     url: str
-    payload: Dict[Any, Any]
+    payload: Union[Dict[Any, Any], bytes]
     headers: Dict[str, str] = field(default_factory=dict)
     status: DeliveryStatus = DeliveryStatus.PENDING
     attempts: int = 0
@@ -51,39 +101,139 @@ class WebhookClient:
         timeout: int = 30,
         max_retries: int = 3,
         retry_wait_min: int = 1,
-        retry_wait_max: int = 60
+        retry_wait_max: int = 60,
+        max_tracked_deliveries: int = 10_000,
+        http2: bool = True,
+        max_connections: int = 500,
+        max_keepalive_connections: int = 100,
+        max_concurrent: int = 5
     ):
         self.secret_key = secret_key
         self.timeout = timeout
+        # HTTP/2 is negotiated per https:// origin; plain http:// stays on HTTP/1.1
+        self.http2 = http2 and HTTP2_AVAILABLE
+        # Pool limits, not CPU, cap fan-out throughput; httpx defaults to 100/20
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self.max_concurrent = max_concurrent
         self.max_retries = max_retries
         self.retry_wait_min = retry_wait_min
         self.retry_wait_max = retry_wait_max
-        self.deliveries: Dict[str, WebhookDelivery] = {}
-        self.delivery_callbacks: List[Callable[[WebhookDelivery], None]] = []
+        self.max_tracked_deliveries = max_tracked_deliveries
+        # Most recently used deliveries last; the oldest are evicted past the cap
+        self.deliveries: Dict[str, WebhookDelivery] = OrderedDict()
+        # Running per-status counts over every delivery sent, including evicted ones
+        self._stat_counts: Counter = Counter({status.value: 0 for status in DeliveryStatus})
+        # IDs of tracked deliveries, bucketed by current status
+        # Dicts used as insertion-ordered sets of delivery IDs
+        self._by_status: Dict[DeliveryStatus, Dict[str, None]] = {status: {} for status in DeliveryStatus}
+        self.delivery_callbacks: List[Callable[[WebhookDelivery], Any]] = []
+        self._pending_callbacks: Set[asyncio.Future] = set()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._default_headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "WebhookClient/1.0"
+        }
+        
+        # Keyed HMAC state is derived once; signing copies it per payload. Both
+        # go through OpenSSL's SHA-256 (and its SHA-NI path where available);
+        # the copy skips the key setup that hmac.digest() redoes on every call.
+        self._secret_bytes = secret_key.encode('utf-8') if secret_key else None
+        self._hmac_template = hmac.new(self._secret_bytes, b'', hashlib.sha256) if self._secret_bytes else None
+    
+    async def __aenter__(self) -> "WebhookClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use"""
+        # Creation is synchronous, so there is no await point between the
+        # check and the assignment for another task to race through.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=self.limits
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Wait for pending callbacks, then close the shared HTTP client"""
+        await self.drain_callbacks()
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+        
+    def add_delivery_callback(self, callback: Callable[[WebhookDelivery], Any]):
+        """
+        Add a callback to be called when delivery status changes
         
-    def add_delivery_callback(self, callback: Callable[[WebhookDelivery], None]):
-        """Add a callback to be called when delivery status changes"""
+        Async callbacks run as tasks on the event loop; plain functions run in
+        the default executor so a slow callback cannot stall deliveries.
+        """
         self.delivery_callbacks.append(callback)
     
-    def _create_signature(self, payload: str) -> str:
+    def _create_signature(self, payload: bytes) -> str:
         """Create HMAC-SHA256 signature for the payload"""
-        if not self.secret_key:
+        if self._hmac_template is None:
             return ""
         
-        signature = hmac.new(
-            self.secret_key.encode('utf-8'),
-            payload.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        return f"sha256={signature}"
+        mac = self._hmac_template.copy()
+        mac.update(payload)
+        return "sha256=" + mac.hexdigest()
+    
+    def _track_delivery(self, delivery: WebhookDelivery):
+        """Start tracking a delivery, evicting the least recently used past the cap"""
+        replaced = self.deliveries.get(delivery.id)
+        if replaced is not None:
+            self._by_status[replaced.status].pop(delivery.id, None)
+        self.deliveries[delivery.id] = delivery
+        self.deliveries.move_to_end(delivery.id)
+        self._by_status[delivery.status][delivery.id] = None
+        self._stat_counts[delivery.status.value] += 1
+        while len(self.deliveries) > self.max_tracked_deliveries:
+            _, evicted = self.deliveries.popitem(last=False)
+            self._by_status[evicted.status].pop(evicted.id, None)
+    
+    def _set_status(self, delivery: WebhookDelivery, status: DeliveryStatus):
+        """Change a delivery's status and keep the running counts in step"""
+        if delivery.status is not status:
+            self._stat_counts[delivery.status.value] -= 1
+            self._stat_counts[status.value] += 1
+            # Evicted deliveries still finish, but are no longer indexed
+            if self.deliveries.get(delivery.id) is delivery:
+                self._by_status[delivery.status].pop(delivery.id, None)
+                self._by_status[status][delivery.id] = None
+            delivery.status = status
     
     def _notify_callbacks(self, delivery: WebhookDelivery):
         """Notify all registered callbacks about delivery status change"""
+        if not self.delivery_callbacks:
+            return
+        
+        loop = asyncio.get_running_loop()
         for callback in self.delivery_callbacks:
-            try:
-                callback(delivery)
-            except Exception as e:
-                logger.error(f"Error in delivery callback: {e}")
+            if asyncio.iscoroutinefunction(callback):
+                future = asyncio.ensure_future(callback(delivery))
+            else:
+                future = loop.run_in_executor(None, callback, delivery)
+            self._pending_callbacks.add(future)
+            future.add_done_callback(self._on_callback_done)
+    
+    def _on_callback_done(self, future: asyncio.Future):
+        """Forget a finished callback and log it if it raised"""
+        self._pending_callbacks.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Error in delivery callback: {future.exception()}")
+    
+    async def drain_callbacks(self):
+        """Wait until every dispatched delivery callback has finished"""
+        while self._pending_callbacks:
+            await asyncio.gather(*self._pending_callbacks, return_exceptions=True)
     
     async def send_webhook(
         self,
@@ -96,156 +246,361 @@ class WebhookClient:
         """
         Send a webhook with automatic retry logic
         """
-        if delivery_id is None:
-            delivery_id = f"webhook_{int(time.time() * 1000)}"
+        return await self._send_prepared(url, payload, _json_dumps(payload), delivery_id, headers, max_attempts)
+    
+    async def send_webhook_raw(
+        self,
+        url: str,
+        payload_bytes: bytes,
+        delivery_id: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_attempts: Optional[int] = None
+    ) -> WebhookDelivery:
+        """
+        Send an already-serialized JSON body verbatim, skipping re-encoding
         
-        if headers is None:
-            headers = {}
+        The bytes are signed and posted exactly as given and are also stored
+        as the delivery's payload.
+        """
+        return await self._send_prepared(url, payload_bytes, payload_bytes, delivery_id, headers, max_attempts)
+    
+    async def _send_prepared(
+        self,
+        url: str,
+        payload: Union[Dict[Any, Any], bytes],
+        payload_bytes: bytes,
+        delivery_id: Optional[str],
+        headers: Optional[Dict[str, str]],
+        max_attempts: Optional[int],
+        signature: Optional[str] = None
+    ) -> WebhookDelivery:
+        """Sign (unless a signature is supplied), track and deliver a serialized payload"""
+        # One clock read per send feeds the default ID, timestamp header and created_at
+        now_ns = time.time_ns()
+        if delivery_id is None:
+            delivery_id = f"webhook_{now_ns // 1_000_000}"
         
         if max_attempts is None:
             max_attempts = self.max_retries
+        # The first attempt is always made, even with max_retries=0
+        max_attempts = max(1, max_attempts)
+        
+        # Build outgoing headers in one dict; defaults take precedence over caller headers
+        out_headers = {
+            **(headers or {}),
+            **self._default_headers,
+            "X-Webhook-ID": delivery_id,
+            "X-Webhook-Timestamp": str(now_ns // 1_000_000_000)
+        }
+        
+        # Add signature if secret key is provided
+        if self.secret_key:
+            if signature is None:
+                signature = self._create_signature(payload_bytes)
+            out_headers["X-Hub-Signature-256"] = signature
         
-        # Create delivery record
+        # Create and store delivery record
         delivery = WebhookDelivery(
             id=delivery_id,
             url=url,
             payload=payload,
-            headers=headers.copy(),
-            max_attempts=max_attempts
+            headers=out_headers,
+            max_attempts=max_attempts,
+            created_at=now_ns / 1e9
         )
+        self._track_delivery(delivery)
         
-        # Store delivery
-        self.deliveries[delivery_id] = delivery
-        
-        # Add default headers
-        payload_str = json.dumps(payload, separators=(',', ':'))
-        delivery.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "WebhookClient/1.0",
-            "X-Webhook-ID": delivery_id,
-            "X-Webhook-Timestamp": str(int(time.time()))
-        })
-        
-        # Add signature if secret key is provided
-        if self.secret_key:
-            signature = self._create_signature(payload_str)
-            delivery.headers["X-Hub-Signature-256"] = signature
-        
-        # Attempt delivery with retry logic
+        # Attempt delivery with retry logic (unexpected errors fail the delivery outright)
         try:
-            await self._deliver_with_retry(delivery, payload_str)
+            await self._deliver_with_retry(delivery, payload_bytes)
         except Exception as e:
-            delivery.status = DeliveryStatus.FAILED
+            self._set_status(delivery, DeliveryStatus.FAILED)
             delivery.error_message = str(e)
             logger.error(f"Failed to deliver webhook {delivery_id}: {e}")
         
         self._notify_callbacks(delivery)
         return delivery
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=60),
-        retry=retry_if_exception_type((httpx.ConnectError, httpx.TimeoutException, httpx.HTTPStatusError))
-    )
-    async def _deliver_with_retry(self, delivery: WebhookDelivery, payload_str: str):
-        """Deliver webhook with automatic retry logic"""
-        delivery.attempts += 1
-        delivery.last_attempt_at = time.time()
-        delivery.status = DeliveryStatus.RETRYING if delivery.attempts > 1 else DeliveryStatus.PENDING
-        
-        logger.info(f"Attempting webhook delivery {delivery.id} (attempt {delivery.attempts}/{delivery.max_attempts})")
+    @staticmethod
+    async def _read_response_prefix(response: httpx.Response, limit: int) -> str:
+        """Read and decode at most limit bytes of a streamed response body"""
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) >= limit:
+                break
+        return body[:limit].decode(response.encoding or 'utf-8', errors='replace')
+    
+    async def _deliver_with_retry(self, delivery: WebhookDelivery, payload_bytes: bytes):
+        """Deliver webhook, retrying with exponential backoff on transient errors"""
+        client = self._get_client()
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        while delivery.attempts < delivery.max_attempts:
+            delivery.attempts += 1
+            delivery.last_attempt_at = time.time()
+            self._set_status(delivery, DeliveryStatus.RETRYING if delivery.attempts > 1 else DeliveryStatus.PENDING)
+            
+            logger.info(f"Attempting webhook delivery {delivery.id} (attempt {delivery.attempts}/{delivery.max_attempts})")
+            
+            retry_after = None
             try:
-                response = await client.post(
+                async with client.stream(
+                    "POST",
                     delivery.url,
-                    data=payload_str,
+                    content=payload_bytes,
                     headers=delivery.headers
-                )
-                
-                delivery.response_status = response.status_code
-                delivery.response_body = response.text[:1000]  # Limit response body size
+                ) as response:
+                    delivery.response_status = response.status_code
+                    delivery.response_body = await self._read_response_prefix(response, 1000)  # Limit response body size
                 
                 # Check if delivery was successful
                 if 200 <= response.status_code < 300:
-                    delivery.status = DeliveryStatus.SUCCESS
+                    self._set_status(delivery, DeliveryStatus.SUCCESS)
                     logger.info(f"Webhook {delivery.id} delivered successfully (status: {response.status_code})")
-                else:
-                    # Raise exception to trigger retry for 4xx/5xx errors
-                    response.raise_for_status()
-                    
-            except httpx.HTTPStatusError as e:
-                delivery.error_message = f"HTTP {e.response.status_code}: {e.response.text[:200]}"
-                if delivery.attempts >= delivery.max_attempts:
-                    delivery.status = DeliveryStatus.FAILED
-                    raise
-                else:
-                    logger.warning(f"Webhook {delivery.id} failed (attempt {delivery.attempts}): {delivery.error_message}")
-                    raise
-                    
+                    return
+                
+                # Reuse the body prefix already decoded above
+                delivery.error_message = f"HTTP {response.status_code}: {delivery.response_body[:200]}"
+                
+                # Client errors will not succeed on retry, except timeouts and rate limits
+                if 400 <= response.status_code < 500 and response.status_code not in RETRIABLE_CLIENT_ERRORS:
+                    break
+                
+                logger.warning(f"Webhook {delivery.id} failed (attempt {delivery.attempts}): {delivery.error_message}")
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                
             except (httpx.ConnectError, httpx.TimeoutException) as e:
                 delivery.error_message = f"Network error: {str(e)}"
-                if delivery.attempts >= delivery.max_attempts:
-                    delivery.status = DeliveryStatus.FAILED
-                    raise
+                logger.warning(f"Webhook {delivery.id} network error (attempt {delivery.attempts}): {delivery.error_message}")
+            
+            if delivery.attempts < delivery.max_attempts:
+                if retry_after is not None:
+                    # The endpoint said when to come back; still never wait past retry_wait_max
+                    delay = min(self.retry_wait_max, retry_after)
                 else:
-                    logger.warning(f"Webhook {delivery.id} network error (attempt {delivery.attempts}): {delivery.error_message}")
-                    raise
+                    # Exponential backoff: retry_wait_min, 2x, 4x, ... capped at retry_wait_max
+                    delay = min(self.retry_wait_max, self.retry_wait_min * (1 << (delivery.attempts - 1)))
+                await asyncio.sleep(delay)
+        
+        if delivery.error_message is None:
+            delivery.error_message = f"No delivery attempt made (max_attempts={delivery.max_attempts})"
+        self._set_status(delivery, DeliveryStatus.FAILED)
+        logger.error(f"Failed to deliver webhook {delivery.id} after {delivery.attempts} attempts: {delivery.error_message}")
     
     async def send_multiple(
         self,
         webhooks: List[Dict[str, Any]],
-        max_concurrent: int = 5
+        max_concurrent: Optional[int] = None
     ) -> List[WebhookDelivery]:
         """
         Send multiple webhooks concurrently
         
         Args:
             webhooks: List of webhook configs with 'url', 'payload', and optional 'headers'
-            max_concurrent: Maximum number of concurrent requests
+            max_concurrent: Maximum number of concurrent requests (defaults to the client's)
         """
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def send_single(webhook_config):
-            async with semaphore:
-                return await self.send_webhook(
-                    url=webhook_config['url'],
-                    payload=webhook_config['payload'],
-                    headers=webhook_config.get('headers'),
-                    delivery_id=webhook_config.get('delivery_id')
-                )
+        if max_concurrent is None:
+            max_concurrent = self.max_concurrent
+        worker_count = max(1, min(max_concurrent, len(webhooks)))
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(webhooks):
+            queue.put_nowait(item)
+        for _ in range(worker_count):
+            queue.put_nowait(None)
+        
+        # The webhooks list keeps every payload alive, so id() is a safe cache key
+        # for fanning one payload object out to many URLs.
+        results = await self._run_workers(queue, worker_count, prepared={})
+        return [results[index] for index in range(len(webhooks))]
+    
+    async def send_stream(
+        self,
+        webhooks: AsyncIterable[Dict[str, Any]],
+        max_concurrent: Optional[int] = None
+    ) -> List[WebhookDelivery]:
+        """
+        Send webhooks from an async iterable while it is still producing them
+        
+        Only a few configs are buffered ahead of the workers, so a large source
+        is consumed as it is sent rather than loaded up front. Results are
+        returned in source order, exceptions in place as with send_multiple.
+        If the source itself raises, configs already read are still sent
+        before the error propagates.
+        """
+        if max_concurrent is None:
+            max_concurrent = self.max_concurrent
+        worker_count = max(1, max_concurrent)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count)
+        
+        workers = asyncio.ensure_future(self._run_workers(queue, worker_count))
+        
+        async def put(item: Any) -> bool:
+            """Queue an item for the workers; False once the worker pool has exited"""
+            if not queue.full():
+                queue.put_nowait(item)
+                return True
+            put_task = asyncio.ensure_future(queue.put(item))
+            try:
+                await asyncio.wait({put_task, workers}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                if not put_task.done():
+                    put_task.cancel()
+            return put_task.done() and not put_task.cancelled()
+        
+        async def close_queue():
+            # One sentinel per worker; skipped once the pool is gone so this never blocks
+            for _ in range(worker_count):
+                if workers.done() or not await put(None):
+                    return
+        
+        async def feed() -> int:
+            count = 0
+            try:
+                async for webhook_config in webhooks:
+                    if not await put((count, webhook_config)):
+                        break
+                    count += 1
+            except Exception:
+                await close_queue()
+                raise
+            await close_queue()
+            return count
+        
+        try:
+            count = await feed()
+        except Exception:
+            # feed() has already queued the worker sentinels; let the configs it
+            # handed out finish sending before the source's error propagates
+            await workers
+            raise
+        except BaseException:
+            workers.cancel()
+            raise
+        results = await workers
+        return [results[index] for index in range(count)]
+    
+    async def _run_workers(
+        self,
+        queue: asyncio.Queue,
+        worker_count: int,
+        prepared: Optional[Dict[int, Tuple[bytes, str]]] = None
+    ) -> Dict[int, Any]:
+        """
+        Send queued (index, webhook_config) items with a fixed pool of workers
+        
+        Each worker exits when it takes a None sentinel off the queue, so the
+        producer must enqueue one sentinel per worker. Returns a mapping of
+        index to WebhookDelivery, or to the exception raised while sending.
+        
+        When a prepared dict is given, the serialized bytes and signature of
+        each payload are cached in it by id(), so a payload shared by several
+        configs is encoded and signed once. Callers must keep the payloads
+        alive for the duration of the call.
+        """
+        results: Dict[int, Any] = {}
         
-        tasks = [send_single(webhook) for webhook in webhooks]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, webhook_config = item
+                try:
+                    payload = webhook_config['payload']
+                    if prepared is None:
+                        payload_bytes, signature = _json_dumps(payload), None
+                    else:
+                        if id(payload) not in prepared:
+                            payload_bytes = _json_dumps(payload)
+                            prepared[id(payload)] = (payload_bytes, self._create_signature(payload_bytes))
+                        payload_bytes, signature = prepared[id(payload)]
+                    
+                    results[index] = await self._send_prepared(
+                        url=webhook_config['url'],
+                        payload=payload,
+                        payload_bytes=payload_bytes,
+                        delivery_id=webhook_config.get('delivery_id'),
+                        headers=webhook_config.get('headers'),
+                        max_attempts=None,
+                        signature=signature
+                    )
+                except Exception as e:
+                    results[index] = e
+        
+        if sys.version_info >= (3, 11):
+            # Structured concurrency: a failing worker cancels its siblings
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(worker_count):
+                    task_group.create_task(worker())
+        else:
+            await asyncio.gather(*(worker() for _ in range(worker_count)))
+        return results
+    
+    async def send_batch(
+        self,
+        url: str,
+        payloads: List[Dict[Any, Any]],
+        max_batch: int = 50,
+        headers: Optional[Dict[str, str]] = None
+    ) -> List[WebhookDelivery]:
+        """
+        Send many payloads to one URL, packing up to max_batch per request
+        
+        Each request body is {"deliveries": [...]} and is signed once, so
+        receivers can tell batched bodies apart from single events.
+        """
+        deliveries = []
+        for start in range(0, len(payloads), max_batch):
+            delivery = await self.send_webhook(
+                url=url,
+                payload={"deliveries": payloads[start:start + max_batch]},
+                headers=headers
+            )
+            deliveries.append(delivery)
+        return deliveries
     
     def get_delivery(self, delivery_id: str) -> Optional[WebhookDelivery]:
         """Get delivery by ID"""
-        return self.deliveries.get(delivery_id)
+        delivery = self.deliveries.get(delivery_id)
+        if delivery is not None:
+            self.deliveries.move_to_end(delivery_id)
+        return delivery
     
     def get_all_deliveries(self) -> List[WebhookDelivery]:
         """Get all deliveries"""
         return list(self.deliveries.values())
     
     def get_deliveries_by_status(self, status: DeliveryStatus) -> List[WebhookDelivery]:
-        """Get deliveries by status"""
-        return [d for d in self.deliveries.values() if d.status == status]
+        """Get deliveries by status, in the order they reached it"""
+        return [self.deliveries[delivery_id] for delivery_id in self._by_status[status]]
     
     def get_delivery_stats(self) -> Dict[str, int]:
         """Get delivery statistics"""
-        stats = {status.value: 0 for status in DeliveryStatus}
-        for delivery in self.deliveries.values():
-            stats[delivery.status.value] += 1
-        return stats
+        return dict(self._stat_counts)
 
 # Example event emitter class
 class EventEmitter:
     """
     Example class that emits webhooks for various events
+    
+    With batch_size set, events are queued and a background task posts them
+    in batches of up to batch_size per URL, flushing at least every
+    flush_interval_ms. Call flush() or aclose() to wait for queued events.
     """
     
-    def __init__(self, webhook_client: WebhookClient, webhook_urls: List[str]):
+    def __init__(
+        self,
+        webhook_client: WebhookClient,
+        webhook_urls: List[str],
+        batch_size: Optional[int] = None,
+        flush_interval_ms: int = 500
+    ):
         self.webhook_client = webhook_client
         self.webhook_urls = webhook_urls
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
     
     async def emit_user_created(self, user_data: Dict[str, Any]):
         """Emit user created event"""
@@ -267,8 +622,32 @@ class EventEmitter:
         
         await self._emit_to_all_urls(payload)
     
+    async def flush(self):
+        """Wait until every queued event has been sent"""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    async def aclose(self):
+        """Flush queued events and stop the background batch task"""
+        await self.flush()
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+    
     async def _emit_to_all_urls(self, payload: Dict[str, Any]):
         """Send webhook to all configured URLs"""
+        if self.batch_size:
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            if self._batch_task is None:
+                self._batch_task = asyncio.ensure_future(self._batch_loop())
+            self._queue.put_nowait(payload)
+            return
+        
         webhooks = [
             {"url": url, "payload": payload}
             for url in self.webhook_urls
@@ -281,37 +660,66 @@ class EventEmitter:
                 logger.error(f"Failed to send webhook to {self.webhook_urls[i]}: {result}")
             else:
                 logger.info(f"Webhook sent to {self.webhook_urls[i]}: {result.status.value}")
+    
+    async def _batch_loop(self):
+        """Drain the queue into batches of up to batch_size events"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_ms / 1000
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                results = await asyncio.gather(
+                    *(self.webhook_client.send_batch(url, batch, max_batch=self.batch_size) for url in self.webhook_urls),
+                    return_exceptions=True
+                )
+                for url, result in zip(self.webhook_urls, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Failed to send batch of {len(batch)} events to {url}: {result}")
+                    else:
+                        logger.info(f"Batch of {len(batch)} events sent to {url}: {result[0].status.value}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
 
 if __name__ == "__main__":
     async def main():
         # Example usage
-        client = WebhookClient(
+        async with WebhookClient(
             secret_key="your-secret-key-here",
             max_retries=3
-        )
-        
-        # Add delivery callback for monitoring
-        def on_delivery_change(delivery: WebhookDelivery):
-            print(f"Delivery {delivery.id}: {delivery.status.value}")
-        
-        client.add_delivery_callback(on_delivery_change)
-        
-        # Send a test webhook
-        test_payload = {
-            "event_type": "test.event",
-            "data": {"message": "Hello from webhook client!"}
-        }
-        
-        delivery = await client.send_webhook(
-            url="http://localhost:8000/webhook",
-            payload=test_payload
-        )
-        
-        print(f"Delivery result: {delivery.status.value}")
-        print(f"Response status: {delivery.response_status}")
-        
-        # Print delivery stats
-        stats = client.get_delivery_stats()
-        print(f"Delivery stats: {stats}")
+        ) as client:
+            # Add delivery callback for monitoring
+            def on_delivery_change(delivery: WebhookDelivery):
+                print(f"Delivery {delivery.id}: {delivery.status.value}")
+            
+            client.add_delivery_callback(on_delivery_change)
+            
+            # Send a test webhook
+            test_payload = {
+                "event_type": "test.event",
+                "data": {"message": "Hello from webhook client!"}
+            }
+            
+            delivery = await client.send_webhook(
+                url="http://localhost:8000/webhook",
+                payload=test_payload
+            )
+            
+            print(f"Delivery result: {delivery.status.value}")
+            print(f"Response status: {delivery.response_status}")
+            
+            # Print delivery stats
+            stats = client.get_delivery_stats()
+            print(f"Delivery stats: {stats}")
     
+    install_uvloop()
     asyncio.run(main())
\ No newline at end of file
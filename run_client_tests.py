@@ -7,7 +7,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'client'))
 
 from client.test_webhook_client import main
+from client.webhook_client import install_uvloop
 import asyncio
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
\ No newline at end of file
@@ -3,19 +3,21 @@
 Test script for the webhook server
 """
 import requests
-import json
+import orjson
 import hmac
 import hashlib
 import time
 
+import auth_fast
+
 WEBHOOK_URL = "http://localhost:8000/webhook"
 SECRET = "test-secret-for-verification"
 
-def create_signature(payload: str, secret: str) -> str:
+def create_signature(payload: bytes, secret: str) -> str:
     """Create HMAC-SHA256 signature for the payload"""
     signature = hmac.new(
         secret.encode('utf-8'),
-        payload.encode('utf-8'),
+        payload,
         hashlib.sha256
     ).hexdigest()
     return f"sha256={signature}"
@@ -57,15 +59,15 @@ def test_webhook_with_signature():
         }
     }
     
-    payload_str = json.dumps(payload, separators=(',', ':'))
-    signature = create_signature(payload_str, SECRET)
+    payload_bytes = orjson.dumps(payload)
+    signature = create_signature(payload_bytes, SECRET)
     
     headers = {
         "Content-Type": "application/json",
         "X-Hub-Signature-256": signature
     }
     
-    response = requests.post(WEBHOOK_URL, data=payload_str, headers=headers)
+    response = requests.post(WEBHOOK_URL, data=payload_bytes, headers=headers)
     print(f"Status: {response.status_code}")
     print(f"Response: {response.json()}")
     print()
@@ -105,10 +107,135 @@ def test_invalid_json():
     print(f"Response: {response.json()}")
     print()
 
+def test_malformed_signature():
+    """Test webhook with a signature that is not valid hex
+    Expected: 401 - Invalid signature
+    """
+    print("Testing webhook with malformed hex signature...")
+    
+    payload_bytes = orjson.dumps({"event_type": "test.event", "data": {"test": "data"}})
+    headers = {
+        "Content-Type": "application/json",
+        "X-Hub-Signature-256": "sha256=not-hex-at-all"
+    }
+    
+    response = requests.post(WEBHOOK_URL, data=payload_bytes, headers=headers)
+    print(f"Status: {response.status_code}")
+    print(f"Response: {response.json()}")
+    print()
+
+def test_payload_too_large():
+    """Test webhook bodies over the server's 1 MiB default limit
+    Expected: 413 - Payload too large, both with a Content-Length and chunked
+    """
+    print("Testing oversized webhook payloads...")
+    
+    payload_bytes = orjson.dumps({"event_type": "test.large", "data": {"blob": "x" * (1 << 20)}})
+    headers = {
+        "Content-Type": "application/json",
+        "X-Hub-Signature-256": create_signature(payload_bytes, SECRET)
+    }
+    
+    response = requests.post(WEBHOOK_URL, data=payload_bytes, headers=headers)
+    print(f"Status (Content-Length): {response.status_code}")
+    print(f"Response: {response.json()}")
+    
+    # A generator body is sent with Transfer-Encoding: chunked and no Content-Length
+    def chunks():
+        for start in range(0, len(payload_bytes), 64 * 1024):
+            yield payload_bytes[start:start + 64 * 1024]
+    
+    response = requests.post(WEBHOOK_URL, data=chunks(), headers=headers)
+    print(f"Status (chunked): {response.status_code}")
+    print(f"Response: {response.json()}")
+    print()
+
+def test_non_object_payload():
+    """Test a signed webhook whose JSON body is not an object
+    Expected: 400 - Invalid webhook payload
+    """
+    print("Testing webhook with a non-object JSON body...")
+    
+    payload_bytes = orjson.dumps([1, 2])
+    headers = {
+        "Content-Type": "application/json",
+        "X-Hub-Signature-256": create_signature(payload_bytes, SECRET)
+    }
+    
+    response = requests.post(WEBHOOK_URL, data=payload_bytes, headers=headers)
+    print(f"Status: {response.status_code}")
+    print(f"Response: {response.json()}")
+    print()
+
+def test_batched_deliveries():
+    """Test a signed batch body carrying several events
+    Expected: 200 - One result per event under "deliveries"
+    """
+    print("Testing batched webhook deliveries...")
+    
+    payload = {
+        "deliveries": [
+            {"event_type": "user.created", "data": {"id": "user_1", "email": "one@example.com"}},
+            {"event_type": "order.completed", "data": {"id": "order_1", "amount": 10.0}}
+        ]
+    }
+    payload_bytes = orjson.dumps(payload)
+    headers = {
+        "Content-Type": "application/json",
+        "X-Hub-Signature-256": create_signature(payload_bytes, SECRET)
+    }
+    
+    response = requests.post(WEBHOOK_URL, data=payload_bytes, headers=headers)
+    print(f"Status: {response.status_code}")
+    print(f"Response: {response.json()}")
+    print()
+
+def test_invalid_batch():
+    """Test a signed batch body whose deliveries are not all JSON objects
+    Expected: 400 - Invalid batch
+    """
+    print("Testing batch with a non-object delivery...")
+    
+    payload_bytes = orjson.dumps({"deliveries": [{"event_type": "user.created", "data": {}}, 2]})
+    headers = {
+        "Content-Type": "application/json",
+        "X-Hub-Signature-256": create_signature(payload_bytes, SECRET)
+    }
+    
+    response = requests.post(WEBHOOK_URL, data=payload_bytes, headers=headers)
+    print(f"Status: {response.status_code}")
+    print(f"Response: {response.json()}")
+    print()
+
+def test_auth_fast():
+    """Test the one-shot signature helpers in auth_fast (compiled or not)
+    Expected: valid signatures accepted with and without the sha256= prefix;
+    wrong, malformed and empty signatures rejected
+    """
+    print(f"Testing auth_fast signature helpers ({auth_fast.__file__})...")
+    
+    payload_bytes = orjson.dumps({"event_type": "test.auth", "data": {"n": 1}})
+    signature = create_signature(payload_bytes, SECRET)
+    secret_bytes = SECRET.encode('utf-8')
+    
+    checks = {
+        "prefixed signature": auth_fast.verify_signature(payload_bytes, signature, secret_bytes),
+        "bare hex signature": auth_fast.verify_signature(payload_bytes, signature[7:], secret_bytes),
+        "wrong secret rejected": not auth_fast.verify_signature(payload_bytes, signature, b"wrong-secret"),
+        "tampered payload rejected": not auth_fast.verify_signature(payload_bytes + b" ", signature, secret_bytes),
+        "malformed hex rejected": not auth_fast.verify_signature(payload_bytes, "sha256=zz", secret_bytes),
+        "empty signature rejected": not auth_fast.verify_signature(payload_bytes, "", secret_bytes),
+    }
+    for name, passed in checks.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print()
+
 if __name__ == "__main__":
     print("Webhook Test Suite")
     print("=" * 50)
     
+    test_auth_fast()
+    
     try:
         # Check if server is running
         health_response = requests.get("http://localhost:8000/health")
@@ -120,6 +247,11 @@ if __name__ == "__main__":
             test_webhook_with_signature()
             test_invalid_signature()
             test_invalid_json()
+            test_malformed_signature()
+            test_payload_too_large()
+            test_non_object_payload()
+            test_batched_deliveries()
+            test_invalid_batch()
             
         else:
             print("❌ Webhook server is not responding")
@@ -1,14 +1,27 @@
 from fastapi import FastAPI, Request, HTTPException
-from typing import Dict, Any, Optional
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from typing import Dict, Any, Callable, Mapping, Tuple
 import json
 import logging
 import hmac
 import hashlib
+import inspect
 import os
+import ssl
+import sys
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from auth_fast import signature_matches
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser and JSONResponse
+    orjson = None
+
+# Load environment variables from .env; set SKIP_DOTENV=1 where the environment
+# is already injected (containers, serverless) to skip the file search and parse
+if not os.getenv("SKIP_DOTENV"):
+    load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,134 +31,235 @@ logger = logging.getLogger(__name__)
 # To run test_webhook.py, set the environment variable:
 #   export WEBHOOK_SECRET="test-secret-for-verification"
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "your-secret-key-here")
-logger.info(f"Webhook secret configured: {'YES' if WEBHOOK_SECRET != 'your-secret-key-here' else 'NO (using default)'}")
+# Encoded once here instead of on every request
+WEBHOOK_SECRET_BYTES = WEBHOOK_SECRET.encode('utf-8')
+SIGNATURE_ENABLED = bool(WEBHOOK_SECRET) and WEBHOOK_SECRET != "your-secret-key-here"
+# Keyed HMAC state for WEBHOOK_SECRET; copying it skips the per-request key setup
+_HMAC_TEMPLATE = hmac.new(WEBHOOK_SECRET_BYTES, b"", hashlib.sha256)
 
-app = FastAPI(title="Simple Webhook Server", version="1.0.0")
+# Largest request body accepted, in bytes (default 1 MiB)
+MAX_BODY = int(os.getenv("WEBHOOK_MAX_BODY", 1 << 20))
+logger.info("Webhook secret configured: %s", "YES" if SIGNATURE_ENABLED else "NO (using default)")
 
-def verify_signature(payload: bytes, signature: str, secret: str) -> bool:
-    """
-    Verify webhook signature using HMAC-SHA256
-    """
-    if not signature:
-        return False
-    
-    try:
-        # Remove 'sha256=' prefix if present (GitHub style)
-        if signature.startswith('sha256='):
-            signature = signature[7:]
-        
-        # Create expected signature
-        expected_signature = hmac.new(
-            secret.encode('utf-8'),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
-        
-        # Use secure comparison to prevent timing attacks
-        return hmac.compare_digest(signature, expected_signature)
-    except Exception as e:
-        logger.error(f"Error verifying signature: {str(e)}")
-        return False
+# hmac hands SHA-256 to OpenSSL, which uses SHA-NI / ARMv8 SHA2
+# instructions from 1.1.1 on when the CPU has them
+logger.info("Signature verification backend: %s", ssl.OPENSSL_VERSION)
+if ssl.OPENSSL_VERSION_INFO < (1, 1, 1):
+    logger.warning("OpenSSL older than 1.1.1: HMAC-SHA256 will not use hardware SHA extensions")
+
+# Response class for JSON replies: orjson serialization when it is installed
+JSONResponseClass = ORJSONResponse if orjson is not None else JSONResponse
+
+app = FastAPI(
+    title="Simple Webhook Server",
+    version="1.0.0",
+    default_response_class=JSONResponseClass
+)
+
+# Incoming webhook body: any JSON object, with every top-level field kept
+# (event_type, data, timestamp, provider-specific fields, batched deliveries)
+WebhookPayload = Dict[str, Any]
+
+def parse_json(body: bytes) -> Any:
+    """Parse a JSON request body straight from bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+# Static GET responses are serialized once and the same Response is returned every time
+_ROOT_RESPONSE = Response(content=b'{"message":"Webhook server is running"}', media_type="application/json")
+_HEALTH_RESPONSE = Response(content=b'{"status":"healthy"}', media_type="application/json")
 
 @app.get("/")
 async def root():
-    return {"message": "Webhook server is running"}
+    return _ROOT_RESPONSE
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
-@app.post("/webhook")
+@app.post("/webhook", response_class=JSONResponseClass, response_model=None)
 async def receive_webhook(request: Request):
     """
     Main webhook endpoint that receives and processes webhook payloads
     """
     try:
-        # Get raw body for signature verification if needed
-        raw_body = await request.body()
-        logger.info(f"Raw body received: {raw_body[:100]}...")  # Log first 100 chars
+        # Reject oversized bodies up front when the client declares a length
+        try:
+            content_length = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if content_length > MAX_BODY:
+            logger.warning("Payload too large: %d bytes", content_length)
+            raise HTTPException(status_code=413, detail="Payload too large")
         
-        # Get headers
-        headers = dict(request.headers)
-        logger.info(f"Headers received: {list(headers.keys())}")
+        # Get raw body, capped for chunked uploads too. The HMAC is updated chunk by
+        # chunk as the body arrives, so verification needs no second pass over it.
+        mac = _HMAC_TEMPLATE.copy() if SIGNATURE_ENABLED else None
+        body_buf = bytearray()
+        async for chunk in request.stream():
+            body_buf += chunk
+            if len(body_buf) > MAX_BODY:
+                logger.warning("Payload too large: over %d bytes", MAX_BODY)
+                raise HTTPException(status_code=413, detail="Payload too large")
+            if mac is not None:
+                mac.update(chunk)
+        raw_body = bytes(body_buf)
+        logger.info("Webhook body received: %d bytes", len(raw_body))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw body: %r...", raw_body[:100])  # Log first 100 chars
         
-        # Verify signature if secret is configured
-        if WEBHOOK_SECRET and WEBHOOK_SECRET != "your-secret-key-here":
-            signature = headers.get("x-hub-signature-256") or headers.get("x-signature-256") or headers.get("signature")
-            if signature and not verify_signature(raw_body, signature, WEBHOOK_SECRET):
-                logger.warning("Invalid webhook signature")
-                raise HTTPException(status_code=401, detail="Invalid signature")
-            elif not signature:
+        # Get headers (Starlette's case-insensitive Headers, read in place rather than copied)
+        headers = request.headers
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Headers received: %s", list(headers.keys()))
+        
+        # Verify signature if secret is configured (headers are only probed when it is)
+        if SIGNATURE_ENABLED:
+            # One dict over the raw (already lowercased) header pairs, probed with bytes keys
+            raw_headers = dict(headers.raw)
+            raw_signature = (
+                raw_headers.get(b"x-hub-signature-256")
+                or raw_headers.get(b"x-signature-256")
+                or raw_headers.get(b"signature")
+            )
+            signature = raw_signature.decode("latin-1") if raw_signature else None
+            if not signature:
                 logger.warning("No signature provided but signature verification is enabled")
                 raise HTTPException(status_code=401, detail="Signature required")
+            if not signature_matches(signature, mac.digest()):
+                logger.warning("Invalid webhook signature")
+                raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Parse JSON payload
         try:
-            payload = json.loads(raw_body.decode('utf-8'))
-        except json.JSONDecodeError:
+            payload = parse_json(raw_body)
+        except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
             logger.error("Invalid JSON payload received")
             raise HTTPException(status_code=400, detail="Invalid JSON payload")
+        if not isinstance(payload, dict):
+            logger.error("Webhook payload is not a JSON object")
+            raise HTTPException(status_code=400, detail="Invalid webhook payload: expected a JSON object")
         
-        # Log the webhook event
-        logger.info(f"Webhook received: {payload}")
-        logger.info(f"Headers: {headers}")
+        # Log the full webhook event only when debugging; repr() walks the whole payload
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Webhook received: %s", payload)
+            logger.debug("Headers: %s", headers)
         
         # Process the webhook payload
         result = await process_webhook_payload(payload, headers)
         
-        return {"status": "success", "message": "Webhook processed", "result": result}
+        # Returning the response directly skips FastAPI's jsonable_encoder pass;
+        # results only hold JSON-native values
+        return JSONResponseClass({"status": "success", "message": "Webhook processed", "result": result})
         
     except HTTPException:
         # Re-raise HTTPException without modification (401, 400, etc.)
         raise
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        logger.error(f"Error processing webhook: {str(e)}")
-        logger.error(f"Full traceback: {error_details}")
+        # logger.exception attaches the traceback; the handler formats it
+        logger.exception("Error processing webhook: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-async def process_webhook_payload(payload: Dict[Any, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+async def process_webhook_payload(payload: WebhookPayload, headers: Mapping[str, str]) -> Dict[str, Any]:
     """
     Process the webhook payload based on your business logic
     """
+    # Batched bodies ({"deliveries": [...]} with no event_type of their own) carry
+    # several events at once; an event's own "deliveries" field is left alone
+    deliveries = payload.get("deliveries")
+    if "event_type" not in payload and isinstance(deliveries, list):
+        if not all(isinstance(event, dict) for event in deliveries):
+            logger.error("Batched webhook contains a delivery that is not a JSON object")
+            raise HTTPException(status_code=400, detail="Invalid batch: every delivery must be a JSON object")
+        # Each event is dispatched directly, so nested envelopes are never unpacked
+        results = [await dispatch_event(event) for event in deliveries]
+        return {"processed": True, "deliveries": results}
+    
+    return await dispatch_event(payload)
+
+async def dispatch_event(payload: WebhookPayload) -> Dict[str, Any]:
+    """
+    Run the handler registered for a single event's event_type
+    """
     # Example processing - customize this based on your needs
     event_type = payload.get("event_type", "unknown")
     
-    if event_type == "user.created":
-        return await handle_user_created(payload)
-    elif event_type == "order.completed":
-        return await handle_order_completed(payload)
-    else:
-        logger.info(f"Unhandled event type: {event_type}")
-        return {"processed": True, "event_type": event_type}
-
-async def handle_user_created(payload: Dict[Any, Any]) -> Dict[str, Any]:
+    # Unhashable event types (e.g. lists) can never match a handler
+    entry = _HANDLERS.get(event_type) if isinstance(event_type, str) else None
+    if entry is not None:
+        handler, is_async = entry
+        if is_async:
+            return await handler(payload)
+        return handler(payload)
+    
+    logger.info("Unhandled event type: %s", event_type)
+    return {"processed": True, "event_type": event_type}
+
+def handle_user_created(payload: WebhookPayload) -> Dict[str, Any]:
     """Handle user creation events"""
     user_data = payload.get("data", {})
     user_id = user_data.get("id")
     user_email = user_data.get("email")
     
-    logger.info(f"Processing user creation: ID={user_id}, Email={user_email}")
+    logger.info("Processing user creation: ID=%s, Email=%s", user_id, user_email)
     
     # Add your business logic here
     # For example: send welcome email, create user profile, etc.
     
     return {"action": "user_created", "user_id": user_id}
 
-async def handle_order_completed(payload: Dict[Any, Any]) -> Dict[str, Any]:
+def handle_order_completed(payload: WebhookPayload) -> Dict[str, Any]:
     """Handle order completion events"""
     order_data = payload.get("data", {})
     order_id = order_data.get("id")
     amount = order_data.get("amount")
     
-    logger.info(f"Processing order completion: ID={order_id}, Amount={amount}")
+    logger.info("Processing order completion: ID=%s, Amount=%s", order_id, amount)
     
     # Add your business logic here
     # For example: send confirmation email, update inventory, etc.
     
     return {"action": "order_completed", "order_id": order_id}
 
+# Event type -> (handler, is_async); register new events with _register_handler.
+# Handlers may be plain functions or coroutine functions (for ones that do I/O).
+_HANDLERS: Dict[str, Tuple[Callable[[WebhookPayload], Any], bool]] = {}
+
+def _register_handler(event_type: str, handler: Callable[[WebhookPayload], Any]) -> None:
+    _HANDLERS[sys.intern(event_type)] = (handler, inspect.iscoroutinefunction(handler))
+
+_register_handler("user.created", handle_user_created)
+_register_handler("order.completed", handle_order_completed)
+
+def _uvicorn_backends() -> Dict[str, str]:
+    """Pick uvloop + httptools when installed (uvloop is unavailable on Windows)"""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    return {"loop": loop, "http": http}
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # One worker process per core unless WEBHOOK_WORKERS says otherwise
+    workers = int(os.getenv("WEBHOOK_WORKERS", os.cpu_count() or 1))
+    uvicorn.run(
+        "webhook_server:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        log_level="warning",
+        access_log=False,  # requests are already logged by receive_webhook
+        backlog=8192,  # absorb bursts of new connections from webhook providers
+        timeout_keep_alive=30,  # let pooling senders reuse connections between deliveries
+        limit_concurrency=1000,  # per worker; excess connections get 503 instead of queueing
+        h11_max_incomplete_event_size=16384,  # only used when falling back to h11
+        **_uvicorn_backends()
+    )
\ No newline at end of file